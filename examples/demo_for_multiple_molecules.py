@@ -1,19 +1,35 @@
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
 from os import listdir, remove
 from zipfile import ZipFile
 
 from pymolbe import draw_colorfully, draw_specially, merge_pictures, merge_animations
 
 
+def draw_picture(index, child_path):
+    temp_path = "./figures/temp" + str(index + 1).zfill(2) + ".png"
+    draw_colorfully(load_path="./data/m/" + child_path, save_path=temp_path)
+    return temp_path, child_path[:4]
+
+
+def draw_animation(index, child_path):
+    temp_path = "./figures/temp" + str(index + 1).zfill(2) + ".gif"
+    draw_specially(load_path="./data/m/" + child_path, save_path=temp_path, motif_colors={"HHHHH": "0xff0000"},
+                   is_movie=True, shafts="y")
+    return temp_path, child_path[:4]
+
+
 if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("--num_procs", type=int, default=None,
+                        help="number of processes to draw the structures (default: all the CPU cores).")
+    arguments = parser.parse_args()
+
     ZipFile("./data/m.zip", "r").extractall(path="./data/")
     child_paths = listdir("./data/m/")
 
-    temp_paths, titles = [], []
-    for index, child_path in enumerate(child_paths):
-        temp_path = "./figures/temp" + str(index + 1).zfill(2) + ".png"
-        draw_colorfully(load_path="./data/m/" + child_path, save_path=temp_path)
-        titles.append(child_path[:4])
-        temp_paths.append(temp_path)
+    with ProcessPoolExecutor(max_workers=arguments.num_procs) as executor:
+        temp_paths, titles = map(list, zip(*executor.map(draw_picture, range(len(child_paths)), child_paths)))
 
     merge_pictures(load_paths=temp_paths, save_path="./figures/m_p.png", row_number=5, column_number=8,
                    figure_size=(10, 6), titles=titles)
@@ -21,13 +37,8 @@ if __name__ == "__main__":
     for used_path in temp_paths:
         remove(used_path)
 
-    temp_paths, titles = [], []
-    for index, child_path in enumerate(listdir("./data/m/")):
-        temp_path = "./figures/temp" + str(index + 1).zfill(2) + ".gif"
-        draw_specially(load_path="./data/m/" + child_path, save_path=temp_path, motif_colors={"HHHHH": "0xff0000"},
-                       is_movie=True, shafts="y")
-        titles.append(child_path[:4])
-        temp_paths.append(temp_path)
+    with ProcessPoolExecutor(max_workers=arguments.num_procs) as executor:
+        temp_paths, titles = map(list, zip(*executor.map(draw_animation, range(len(child_paths)), child_paths)))
 
     merge_animations(load_paths=temp_paths, save_path="./figures/m_ps.gif",
                      row_number=5, column_number=8, figure_size=(10, 6), titles=titles,
@@ -1,14 +1,47 @@
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, ExitStack
 from io import BytesIO
-from matplotlib import pyplot, animation
-from numpy import array
-from os import environ, remove
+from itertools import groupby, repeat
+from numpy import array, asarray, empty, uint8
+from operator import itemgetter
+from os import cpu_count
 from pymol2 import PyMOL
-from PIL import Image, ImageSequence
+from PIL import Image, ImageDraw, ImageFont, ImageSequence
+
+
+def group_residues(residue_colors):
+    """
+    Group the residues with the same color into one selection.
+
+    :param residue_colors: pair of the residue and the color.
+    :type residue_colors: dict
+
+    :return: pairs of the color and the selection of its residues.
+    :rtype: list
+    """
+    residue_groups = {}
+    for residue, hex_color in residue_colors.items():
+        residue_groups.setdefault(hex_color, []).append(residue)
+    return [(hex_color, "(r. " + "+".join(residues) + ")") for hex_color, residues in residue_groups.items()]
+
+
+default_residue_colors = {"ALA": "0x8A685C", "ARG": "0x402F42", "ASN": "0x7fA9C2", "ASP": "0x632D3B", "CYS": "0x7D779D",
+                          "GLN": "0x853D2F", "GLU": "0x88191F", "GLY": "0x945A4F", "HIS": "0xA29DB3", "ILE": "0x645D87",
+                          "LEU": "0x82A293", "LYS": "0xA58121", "MET": "0x6273A1", "PHE": "0xB33C24", "PRO": "0x73584D",
+                          "SER": "0x4F698A", "THR": "0xB9B9BB", "TRP": "0x686C47", "TYR": "0x674E3A", "VAL": "0x9D491B",
+                          "DA": "0xf2521b", "DT": "0xfabc09", "DC": "0x81cc28", "DG": "0x00aef0"}
+
+default_residue_selections = group_residues(residue_colors=default_residue_colors)
+
+_frame_pool = {}
+
+worker_mol, worker_session = None, None
 
 
 def draw_colorfully(load_path, save_path,
                     representation=None, residue_colors=None, neglected_color=None, hides=None,
-                    dpi=400, is_movie=False, shafts="xyz", degree=10, fps=10):
+                    dpi=400, is_movie=False, shafts="xyz", degree=10, fps=10, processes=1, quality="hq",
+                    frame_size=(640, 480), reuse_buffer=False, mol=None):
     """
     Draw a molecular structure colorfully.
 
@@ -47,17 +80,37 @@ def draw_colorfully(load_path, save_path,
 
     :param fps: frames per second (available at is_movie=True).
     :type fps: int
+
+    :param processes: number of processes to render the frames, None for all the CPU cores (available at is_movie=True).
+    :type processes: int or None
+
+    :param quality: "hq" with shadows and antialiasing or "fast" without them (available at is_movie=True).
+    :type quality: str
+
+    :param frame_size: width and height of each frame (in pixels), where smaller frames are ray-traced faster
+                       (available at is_movie=True).
+    :type frame_size: tuple
+
+    :param reuse_buffer: keep the frame buffer in the frame pool for the later animations with the same shape, until
+                         release_frame_pool is called (available at is_movie=True).
+    :type reuse_buffer: bool
+
+    :param mol: PyMOL interface to be reused (reinitialized before loading), or None to start a new one.
+    :type mol: pymol2.PyMOL or None
     """
-    with PyMOL() as mol:
+    with prepare_session(mol=mol) as mol:
         mol.cmd.load(load_path, quiet=1)
         set_initial_state(mol=mol, representation=representation, hides=hides)
         set_residue_colors(mol=mol, residue_colors=residue_colors, neglected_color=neglected_color)
-        save_figure(mol=mol, is_movie=is_movie, save_path=save_path, shafts=shafts, dpi=dpi, degree=degree, fps=fps)
+        save_figure(mol=mol, is_movie=is_movie, save_path=save_path, shafts=shafts, dpi=dpi, degree=degree, fps=fps,
+                    processes=processes, quality=quality, frame_size=frame_size,
+                    reuse_buffer=reuse_buffer)
 
 
 def draw_specially(load_path, save_path,
                    representation=None, motif_colors=None, neglected_color=None, hides=None,
-                   dpi=400, is_movie=False, shafts="xyz", degree=10, fps=10):
+                   dpi=400, is_movie=False, shafts="xyz", degree=10, fps=10, processes=1, quality="hq",
+                   frame_size=(640, 480), reuse_buffer=False, mol=None):
     """
     Draw a molecular structure with special motifs.
 
@@ -96,12 +149,175 @@ def draw_specially(load_path, save_path,
 
     :param fps: frames per second (available at is_movie=True).
     :type fps: int
+
+    :param processes: number of processes to render the frames, None for all the CPU cores (available at is_movie=True).
+    :type processes: int or None
+
+    :param quality: "hq" with shadows and antialiasing or "fast" without them (available at is_movie=True).
+    :type quality: str
+
+    :param frame_size: width and height of each frame (in pixels), where smaller frames are ray-traced faster
+                       (available at is_movie=True).
+    :type frame_size: tuple
+
+    :param reuse_buffer: keep the frame buffer in the frame pool for the later animations with the same shape, until
+                         release_frame_pool is called (available at is_movie=True).
+    :type reuse_buffer: bool
+
+    :param mol: PyMOL interface to be reused (reinitialized before loading), or None to start a new one.
+    :type mol: pymol2.PyMOL or None
     """
-    with PyMOL() as mol:
+    with prepare_session(mol=mol) as mol:
         mol.cmd.load(load_path, quiet=1)
         set_initial_state(mol=mol, representation=representation, hides=hides)
         set_motif_colors(mol=mol, motif_colors=motif_colors, neglected_color=neglected_color)
-        save_figure(mol=mol, is_movie=is_movie, save_path=save_path, shafts=shafts, dpi=dpi, degree=degree, fps=fps)
+        save_figure(mol=mol, is_movie=is_movie, save_path=save_path, shafts=shafts, dpi=dpi, degree=degree, fps=fps,
+                    processes=processes, quality=quality, frame_size=frame_size,
+                    reuse_buffer=reuse_buffer)
+
+
+def draw_many(load_paths, save_paths,
+              representation=None, residue_colors=None, motif_colors=None, neglected_color=None, hides=None,
+              dpi=400, is_movie=False, shafts="xyz", degree=10, fps=10, processes=1, quality="hq",
+              frame_size=(640, 480), reuse_buffer=False):
+    """
+    Draw multiple molecular structures in a single PyMOL session.
+
+    :param load_paths: paths to load structure files.
+    :type load_paths: list
+
+    :param save_paths: paths to save display files.
+    :type save_paths: list
+
+    :param representation: representation type.
+    :type representation: str or None
+
+    :param residue_colors: pair of the residue and the color (available at motif_colors=None).
+    :type residue_colors: dict or None
+
+    :param motif_colors: pair of the motif and the color, which replaces the residue colors if required.
+    :type motif_colors: dict or None
+
+    :param neglected_color: neglected color.
+    :type neglected_color: str or None
+
+    :param hides: hided molecules:
+    :type hides: list or None
+
+    :param dpi: dots per inch.
+    :type dpi: int
+
+    :param is_movie: display through animation.
+    :type is_movie: bool
+
+    :param shafts: rotating shafts.
+    :type shafts: str
+
+    :param degree: single rotation angle (available at is_movie=True).
+    :type degree: int
+
+    :param fps: frames per second (available at is_movie=True).
+    :type fps: int
+
+    :param processes: number of processes to render the frames, None for all the CPU cores (available at is_movie=True).
+    :type processes: int or None
+
+    :param quality: "hq" with shadows and antialiasing or "fast" without them (available at is_movie=True).
+    :type quality: str
+
+    :param frame_size: width and height of each frame (in pixels), where smaller frames are ray-traced faster
+                       (available at is_movie=True).
+    :type frame_size: tuple
+
+    :param reuse_buffer: keep the frame buffer in the frame pool for the later animations with the same shape, until
+                         release_frame_pool is called (available at is_movie=True).
+    :type reuse_buffer: bool
+    """
+    for _ in draw_iteratively(load_paths=load_paths, save_paths=save_paths,
+                              representation=representation, residue_colors=residue_colors, motif_colors=motif_colors,
+                              neglected_color=neglected_color, hides=hides,
+                              dpi=dpi, is_movie=is_movie, shafts=shafts, degree=degree, fps=fps, processes=processes,
+                              quality=quality, frame_size=frame_size, reuse_buffer=reuse_buffer):
+        pass
+
+
+def draw_iteratively(load_paths, save_paths,
+                     representation=None, residue_colors=None, motif_colors=None, neglected_color=None, hides=None,
+                     dpi=400, is_movie=False, shafts="xyz", degree=10, fps=10, processes=1, quality="hq",
+                     frame_size=(640, 480), reuse_buffer=False):
+    """
+    Draw multiple molecular structures one by one in a single PyMOL session.
+
+    :param load_paths: paths to load structure files, which can be streamed.
+    :type load_paths: iterable
+
+    :param save_paths: paths to save display files, which can be streamed.
+    :type save_paths: iterable
+
+    :param representation: representation type.
+    :type representation: str or None
+
+    :param residue_colors: pair of the residue and the color (available at motif_colors=None).
+    :type residue_colors: dict or None
+
+    :param motif_colors: pair of the motif and the color, which replaces the residue colors if required.
+    :type motif_colors: dict or None
+
+    :param neglected_color: neglected color.
+    :type neglected_color: str or None
+
+    :param hides: hided molecules:
+    :type hides: list or None
+
+    :param dpi: dots per inch.
+    :type dpi: int
+
+    :param is_movie: display through animation.
+    :type is_movie: bool
+
+    :param shafts: rotating shafts.
+    :type shafts: str
+
+    :param degree: single rotation angle (available at is_movie=True).
+    :type degree: int
+
+    :param fps: frames per second (available at is_movie=True).
+    :type fps: int
+
+    :param processes: number of processes to render the frames, None for all the CPU cores (available at is_movie=True).
+    :type processes: int or None
+
+    :param quality: "hq" with shadows and antialiasing or "fast" without them (available at is_movie=True).
+    :type quality: str
+
+    :param frame_size: width and height of each frame (in pixels), where smaller frames are ray-traced faster
+                       (available at is_movie=True).
+    :type frame_size: tuple
+
+    :param reuse_buffer: keep the frame buffer in the frame pool for the later animations with the same shape, until
+                         release_frame_pool is called (available at is_movie=True).
+    :type reuse_buffer: bool
+
+    :return: path of each saved display file, whose structure is drawn when the path is requested.
+    :rtype: generator
+    """
+    with PyMOL() as mol:
+        for load_path, save_path in zip(load_paths, save_paths):
+            if motif_colors is not None:
+                draw_specially(load_path=load_path, save_path=save_path,
+                               representation=representation, motif_colors=motif_colors,
+                               neglected_color=neglected_color, hides=hides,
+                               dpi=dpi, is_movie=is_movie, shafts=shafts, degree=degree, fps=fps,
+                               processes=processes, quality=quality, frame_size=frame_size,
+                               reuse_buffer=reuse_buffer, mol=mol)
+            else:
+                draw_colorfully(load_path=load_path, save_path=save_path,
+                                representation=representation, residue_colors=residue_colors,
+                                neglected_color=neglected_color, hides=hides,
+                                dpi=dpi, is_movie=is_movie, shafts=shafts, degree=degree, fps=fps,
+                                processes=processes, quality=quality, frame_size=frame_size,
+                                reuse_buffer=reuse_buffer, mol=mol)
+            yield save_path
 
 
 def merge_pictures(load_paths, save_path,
@@ -122,8 +338,8 @@ def merge_pictures(load_paths, save_path,
     :param column_number: picture number in a column.
     :type column_number: int
 
-    :param figure_size: size of saved figure.
-    :type figure_size: tuple
+    :param figure_size: size of saved figure (in inches), or None to keep the size of the loaded pictures.
+    :type figure_size: tuple or None
 
     :param titles: titles of each load paths if required.
     :type titles: list or None
@@ -135,18 +351,18 @@ def merge_pictures(load_paths, save_path,
     if titles is not None:
         assert len(titles) == len(load_paths)
 
-    pyplot.figure(figsize=figure_size, tight_layout=True)
-    for location in range(len(load_paths)):
-        pyplot.subplot(row_number, column_number, location + 1)
-        if titles is not None:
-            pyplot.title(titles[location])
-        pyplot.imshow(Image.open(load_paths[location]))
-        pyplot.xticks([])
-        pyplot.yticks([])
-        pyplot.axis('off')
+    pictures = []
+    for load_path in load_paths:
+        with Image.open(load_path) as image:
+            pictures.append(asarray(image.convert("RGBA")))
 
-    pyplot.savefig(save_path, dpi=dpi)
-    pyplot.close()
+    panel, cells = create_panel(frame_sizes=[(picture.shape[1], picture.shape[0]) for picture in pictures],
+                                row_number=row_number, column_number=column_number,
+                                titles=titles, figure_size=figure_size, dpi=dpi)
+    for cell, picture in zip(cells, pictures):
+        paste_frame(panel=panel, cell=cell, frame=picture)
+
+    flatten_frame(pixels=panel).save(save_path, dpi=(dpi, dpi))
 
 
 def merge_animations(load_paths, save_path,
@@ -167,8 +383,8 @@ def merge_animations(load_paths, save_path,
     :param column_number: picture number in a column.
     :type column_number: int
 
-    :param figure_size: size of saved figure.
-    :type figure_size: tuple
+    :param figure_size: size of saved figure (in inches), or None to keep the size of the loaded frames.
+    :type figure_size: tuple or None
 
     :param titles: titles of each load paths if required.
     :type titles: list or None
@@ -184,70 +400,58 @@ def merge_animations(load_paths, save_path,
     """
     if titles is not None:
         assert len(titles) == len(load_paths)
+    else:
+        titles = [str(location + 1) for location in range(len(load_paths))]
+
+    frame_sizes = []
+    for load_path in load_paths:
+        with Image.open(load_path) as image:
+            frame_sizes.append(image.size)
 
     if simultaneous:
         assert len(load_paths) <= row_number * column_number
-        group, number = None, None
-        for load_path in load_paths:
-            with Image.open(load_path) as image:
-                frames = ImageSequence.all_frames(image)
-                if number is not None:
-                    assert number == len(frames)
-                else:
-                    number = len(frames)
-                    group = [[] for _ in range(number)]
-                for frame_index, frame in enumerate(frames):
-                    group[frame_index].append(frame)
-
+        panel, cells = create_panel(frame_sizes=frame_sizes, row_number=row_number, column_number=column_number,
+                                    titles=titles, figure_size=figure_size, dpi=dpi)
         new_frames = []
-        for frame_index, images in enumerate(group):
-            pyplot.figure(figsize=figure_size, tight_layout=True)
-            for location, image in enumerate(images):
-                pyplot.subplot(row_number, column_number, location + 1)
-                if titles is not None:
-                    pyplot.title(titles[location])
-                else:
-                    pyplot.title(str(location + 1))
-                pyplot.imshow(image)
-                pyplot.xticks([])
-                pyplot.yticks([])
-                pyplot.axis("off")
-            temp_path = environ["TEMP"] + str(frame_index) + ".png"
-            pyplot.savefig(temp_path, dpi=dpi)
-            pyplot.close()
-
-            new_frames.append(array(Image.open(temp_path)))
-            remove(path=temp_path)
+        with ExitStack() as stack:
+            # the animations are decoded in lockstep, so that only the frames of the current moment are kept.
+            images = [stack.enter_context(Image.open(load_path)) for load_path in load_paths]
+            for image in images:
+                assert image.n_frames == images[0].n_frames
+            for frames in zip(*[ImageSequence.Iterator(image) for image in images]):
+                for cell, frame in zip(cells, frames):
+                    paste_frame(panel=panel, cell=cell, frame=asarray(frame.convert("RGBA")))
+                new_frames.append(panel.copy())
     else:
-        new_frames = []
+        largest_size, new_frames = tuple(map(max, zip(*frame_sizes))), []
         for location, load_path in enumerate(load_paths):
+            panel, cells = create_panel(frame_sizes=[largest_size], row_number=1, column_number=1,
+                                        titles=[titles[location]], figure_size=figure_size, dpi=dpi)
             with Image.open(load_path) as image:
-                for frame in ImageSequence.all_frames(image):
-                    pyplot.figure(figsize=figure_size, tight_layout=True)
-                    if titles is not None:
-                        pyplot.title(titles[location])
-                    else:
-                        pyplot.title(str(location + 1))
-                    pyplot.imshow(frame)
-                    pyplot.xticks([])
-                    pyplot.yticks([])
-                    pyplot.axis("off")
-                    temp_path = environ["TEMP"] + str(len(new_frames) + 1) + ".png"
-                    pyplot.savefig(temp_path, dpi=dpi)
-                    pyplot.close()
-
-                    new_frames.append(array(Image.open(temp_path)))
-                    remove(path=temp_path)
-
-    pyplot.figure(figsize=figure_size, tight_layout=True)
-    pyplot.xticks([])
-    pyplot.yticks([])
-    pyplot.axis("off")
-    patch = pyplot.imshow(new_frames[0])
-    worker = animation.FuncAnimation(fig=pyplot.gcf(), frames=len(new_frames), interval=1,
-                                     func=lambda index: patch.set_data(new_frames[index]))
-    worker.save(save_path, writer="pillow", fps=fps)
-    pyplot.close()
+                for frame in ImageSequence.Iterator(image):
+                    paste_frame(panel=panel, cell=cells[0], frame=asarray(frame.convert("RGBA")))
+                    new_frames.append(panel.copy())
+
+    save_animation(frames=new_frames, save_path=save_path, fps=fps)
+
+
+@contextmanager
+def prepare_session(mol=None):
+    """
+    Prepare a clean PyMOL session.
+
+    :param mol: PyMOL interface to be reinitialized and reused, or None to start (and finally stop) a new one.
+    :type mol: pymol2.PyMOL or None
+
+    :return: PyMOL interface.
+    :rtype: pymol2.PyMOL
+    """
+    if mol is None:
+        with PyMOL() as mol:
+            yield mol
+    else:
+        mol.cmd.reinitialize()
+        yield mol
 
 
 def set_initial_state(mol, representation="cartoon", hides=None):
@@ -266,14 +470,14 @@ def set_initial_state(mol, representation="cartoon", hides=None):
     if representation is None:
         representation = "cartoon"
 
-    if representation is not "cartoon":
+    if representation != "cartoon":
         mol.cmd.hide(representation="cartoon")
         mol.cmd.show(representation=representation)
     if hides is not None:
         for hide_selection in hides:
             mol.cmd.hide(selection=hide_selection)
+    # orient already centers the structure, zoom further fits the complete atoms into the view.
     mol.cmd.orient()
-    mol.cmd.center()
     mol.cmd.zoom(complete=1)
 
 
@@ -291,15 +495,13 @@ def set_residue_colors(mol, residue_colors=None, neglected_color=None):
     :type neglected_color: str
     """
     if residue_colors is None:
-        residue_colors = {"ALA": "0x8A685C", "ARG": "0x402F42", "ASN": "0x7fA9C2", "ASP": "0x632D3B", "CYS": "0x7D779D",
-                          "GLN": "0x853D2F", "GLU": "0x88191F", "GLY": "0x945A4F", "HIS": "0xA29DB3", "ILE": "0x645D87",
-                          "LEU": "0x82A293", "LYS": "0xA58121", "MET": "0x6273A1", "PHE": "0xB33C24", "PRO": "0x73584D",
-                          "SER": "0x4F698A", "THR": "0xB9B9BB", "TRP": "0x686C47", "TYR": "0x674E3A", "VAL": "0x9D491B",
-                          "DA": "0xf2521b", "DT": "0xfabc09", "DC": "0x81cc28", "DG": "0x00aef0"}
+        residue_selections = default_residue_selections
+    else:
+        residue_selections = group_residues(residue_colors=residue_colors)
 
     mol.cmd.color(color=neglected_color if neglected_color is not None else "0xFFFFCC", selection="(all)")
-    for residue, hex_color in residue_colors.items():
-        mol.cmd.color(color=hex_color, selection="(r. " + residue + ")")
+    for hex_color, selection in residue_selections:
+        mol.cmd.color(color=hex_color, selection=selection)
 
 
 def set_motif_colors(mol, motif_colors, neglected_color=None):
@@ -316,11 +518,13 @@ def set_motif_colors(mol, motif_colors, neglected_color=None):
     :type neglected_color: str
     """
     mol.cmd.color(color=neglected_color if neglected_color is not None else "0xFFFFCC", selection="(all)")
-    for motif, concerned_color in motif_colors.items():
-        mol.cmd.color(color=concerned_color, selection="(ps. " + motif + ")")
+    # only the neighboring motifs are merged, so that the later motif still covers the overlapped earlier one.
+    for concerned_color, pairs in groupby(motif_colors.items(), key=itemgetter(1)):
+        mol.cmd.color(color=concerned_color, selection=" or ".join(["(ps. " + motif + ")" for motif, _ in pairs]))
 
 
-def save_figure(mol, save_path, shafts="xyz", dpi=400, is_movie=False, degree=10, fps=10, adaptive_size=False):
+def save_figure(mol, save_path, shafts="xyz", dpi=400, is_movie=False, degree=10, fps=10, adaptive_size=False,
+                processes=1, quality="hq", frame_size=(640, 480), reuse_buffer=False):
     """
     Save structure file as the requirement.
 
@@ -345,8 +549,22 @@ def save_figure(mol, save_path, shafts="xyz", dpi=400, is_movie=False, degree=10
     :param fps: frames per second (available at is_movie=True).
     :type fps: int
 
-    :param adaptive_size: change the display size according to the number of structural atoms.
+    :param adaptive_size: change the display size according to the atom number (available at is_movie=False).
     :type adaptive_size: bool
+
+    :param processes: number of processes to render the frames, None for all the CPU cores (available at is_movie=True).
+    :type processes: int or None
+
+    :param quality: "hq" with shadows and antialiasing or "fast" without them (available at is_movie=True).
+    :type quality: str
+
+    :param frame_size: width and height of each frame (in pixels), where smaller frames are ray-traced faster
+                       (available at is_movie=True).
+    :type frame_size: tuple
+
+    :param reuse_buffer: keep the frame buffer in the frame pool for the later animations with the same shape, until
+                         release_frame_pool is called (available at is_movie=True).
+    :type reuse_buffer: bool
     """
     if adaptive_size:
         atoms = mol.cmd.count_atoms('all')
@@ -362,21 +580,278 @@ def save_figure(mol, save_path, shafts="xyz", dpi=400, is_movie=False, degree=10
 
     if is_movie:
         assert save_path[-4:] == ".gif"
-        pyplot.figure(figsize=(width / 100.00, height / 100.00))
-        pyplot.axis("off")
-        frames = []
-        for axis in shafts:
-            for time in range(360 // degree + 1):
-                mol.cmd.rotate(axis=axis, angle=degree)
-                mol.cmd.ray(quiet=1)
-                image_bits = mol.cmd.png(filename=None, dpi=dpi, quiet=1)
-                frames.append(array(Image.open(BytesIO(image_bits))))
-        patch = pyplot.imshow(frames[0])
-        worker = animation.FuncAnimation(fig=pyplot.gcf(), frames=len(frames), interval=1,
-                                         func=lambda frame_index: patch.set_data(frames[frame_index]))
-        worker.save(save_path, writer="pillow", fps=fps)
-        pyplot.close()
+        assert quality in ["hq", "fast"]
+        # the settings of the given session are restored after rendering, so the later figures keep their quality.
+        settings = {name: mol.cmd.get(name) for name in ["ray_shadows", "antialias"]}
+        if quality == "fast":
+            mol.cmd.set("ray_shadows", 0)
+            mol.cmd.set("antialias", 0)
+        try:
+            rotations = [(axis, degree) for axis in shafts for _ in range(360 // degree + 1)]
+            if processes == 1:
+                images = render_frames(mol=mol, rotations=rotations, frame_size=frame_size, dpi=dpi)
+            else:
+                images = render_frames_in_parallel(mol=mol, rotations=rotations, frame_size=frame_size, dpi=dpi,
+                                                   processes=processes)
+        finally:
+            for name, value in settings.items():
+                mol.cmd.set(name, value)
+        frames = None
+        for frame_index, image_bits in enumerate(images):
+            pixels = decode_frame(image_bits=image_bits)
+            if frames is None:
+                frames = obtain_frame_buffer(shape=(len(images),) + pixels.shape, reuse=reuse_buffer)
+            frames[frame_index] = pixels
+        save_animation(frames=frames, save_path=save_path, fps=fps)
     else:
         assert save_path[-4:] == ".png"
         mol.cmd.ray(quiet=1)
         mol.cmd.png(filename=save_path, width=width, height=height, dpi=dpi, quiet=1)
+
+
+def render_frames(mol, rotations, frame_size=(640, 480), dpi=400):
+    """
+    Ray-trace the structure after each rotation of the camera.
+
+    :param mol: PyMOL interface.
+    :type mol: pymol2.PyMOL
+
+    :param rotations: pairs of the rotating shaft and the rotation angle, which are applied in turn.
+    :type rotations: list
+
+    :param frame_size: width and height of each frame (in pixels).
+    :type frame_size: tuple
+
+    :param dpi: dots per inch.
+    :type dpi: int
+
+    :return: PNG bytes of each frame.
+    :rtype: list
+    """
+    images = []
+    for axis, angle in rotations:
+        # turning the camera only changes the view matrix, where the atom coordinates are not touched.
+        mol.cmd.turn(axis=axis, angle=angle)
+        mol.cmd.ray(width=frame_size[0], height=frame_size[1], quiet=1)
+        images.append(mol.cmd.png(filename=None, dpi=dpi, quiet=1))
+    return images
+
+
+def render_frames_in_parallel(mol, rotations, frame_size=(640, 480), dpi=400, processes=None):
+    """
+    Ray-trace the structure after each rotation of the camera, where the rotations are split into consecutive segments
+    and each segment is rendered by a worker process holding a copy of the current session.
+
+    :param mol: PyMOL interface.
+    :type mol: pymol2.PyMOL
+
+    :param rotations: pairs of the rotating shaft and the rotation angle, which are applied in turn.
+    :type rotations: list
+
+    :param frame_size: width and height of each frame (in pixels).
+    :type frame_size: tuple
+
+    :param dpi: dots per inch.
+    :type dpi: int
+
+    :param processes: number of worker processes, None for all the CPU cores.
+    :type processes: int or None
+
+    :return: PNG bytes of each frame.
+    :rtype: list
+    """
+    if processes is None:
+        processes = cpu_count()
+    segment_size = -(-len(rotations) // processes)
+    starts = list(range(0, len(rotations), segment_size))
+
+    with ProcessPoolExecutor(max_workers=len(starts),
+                             initializer=initialize_worker, initargs=(mol.cmd.get_session(),)) as executor:
+        segments = executor.map(render_segment,
+                                [rotations[:start] for start in starts],
+                                [rotations[start: start + segment_size] for start in starts],
+                                repeat(frame_size, len(starts)), repeat(dpi, len(starts)))
+        return [image_bits for segment in segments for image_bits in segment]
+
+
+def initialize_worker(session):
+    """
+    Start the PyMOL interface of a worker process.
+
+    :param session: PyMOL session to be rendered.
+    :type session: dict
+    """
+    global worker_mol, worker_session
+    worker_mol, worker_session = PyMOL(), session
+    worker_mol.start()
+
+
+def render_segment(skipped_rotations, rotations, frame_size=(640, 480), dpi=400):
+    """
+    Render a segment of frames in a worker process.
+
+    :param skipped_rotations: rotations before this segment, which are applied without rendering.
+    :type skipped_rotations: list
+
+    :param rotations: rotations of this segment.
+    :type rotations: list
+
+    :param frame_size: width and height of each frame (in pixels).
+    :type frame_size: tuple
+
+    :param dpi: dots per inch.
+    :type dpi: int
+
+    :return: PNG bytes of each frame in this segment.
+    :rtype: list
+    """
+    worker_mol.cmd.set_session(worker_session)
+    for axis, angle in skipped_rotations:
+        worker_mol.cmd.turn(axis=axis, angle=angle)
+    return render_frames(mol=worker_mol, rotations=rotations, frame_size=frame_size, dpi=dpi)
+
+
+def decode_frame(image_bits):
+    """
+    Decode a rendered PNG frame into pixels.
+
+    :param image_bits: PNG bytes of the frame.
+    :type image_bits: bytes
+
+    :return: pixels of the frame.
+    :rtype: numpy.ndarray
+    """
+    image = Image.open(BytesIO(image_bits))
+    image.load()
+    return asarray(image)
+
+
+def obtain_frame_buffer(shape, reuse=False):
+    """
+    Obtain a frame buffer, which is taken from the frame pool and reused by the later animations with the same shape
+    if required.
+
+    :param shape: shape of the frame buffer, i.e. (frame number, height, width, channel).
+    :type shape: tuple
+
+    :param reuse: keep the frame buffer in the frame pool, or allocate a new one that is freed after use.
+    :type reuse: bool
+
+    :return: frame buffer.
+    :rtype: numpy.ndarray
+    """
+    if not reuse:
+        return empty(shape, dtype=uint8)
+    if shape not in _frame_pool:
+        _frame_pool[shape] = empty(shape, dtype=uint8)
+    return _frame_pool[shape]
+
+
+def release_frame_pool():
+    """
+    Release all the frame buffers kept in the frame pool.
+    """
+    _frame_pool.clear()
+
+
+def save_animation(frames, save_path, fps=10):
+    """
+    Save the frames as a GIF animation through Pillow directly.
+
+    :param frames: pixels of each frame.
+    :type frames: list or numpy.ndarray
+
+    :param save_path: path to save the animation.
+    :type save_path: str
+
+    :param fps: frames per second.
+    :type fps: int
+    """
+    images = [flatten_frame(pixels=pixels) for pixels in frames]
+    images[0].save(save_path, save_all=True, append_images=images[1:], duration=int(1000 / fps), loop=0)
+
+
+def flatten_frame(pixels):
+    """
+    Flatten the pixels onto a white background, where the transparent background of PyMOL frames becomes white.
+
+    :param pixels: RGB or RGBA pixels.
+    :type pixels: numpy.ndarray
+
+    :return: RGB image.
+    :rtype: PIL.Image.Image
+    """
+    image = Image.fromarray(pixels)
+    if image.mode == "RGBA":
+        background = Image.new("RGB", image.size, "white")
+        background.paste(image, mask=image.getchannel("A"))
+        image = background
+    return image
+
+
+def create_panel(frame_sizes, row_number=1, column_number=1, titles=None, figure_size=None, dpi=100):
+    """
+    Create a white panel with a cell for each frame, where the title of each cell is drawn above it.
+
+    :param frame_sizes: width and height of each frame.
+    :type frame_sizes: list
+
+    :param row_number: cell number in a row.
+    :type row_number: int
+
+    :param column_number: cell number in a column.
+    :type column_number: int
+
+    :param titles: titles of each cell if required.
+    :type titles: list or None
+
+    :param figure_size: size of the panel (in inches), or None to keep the largest frame size in each cell.
+    :type figure_size: tuple or None
+
+    :param dpi: dots per inch.
+    :type dpi: int
+
+    :return: RGBA pixels of the panel and the location (left, top, width, height) of each cell.
+    :rtype: numpy.ndarray, list
+    """
+    font = ImageFont.load_default(size=12 * dpi / 72)
+    title_height = sum(font.getmetrics()) if titles is not None else 0
+    if figure_size is None:
+        width, height = max([size[0] for size in frame_sizes]), max([size[1] for size in frame_sizes])
+    else:
+        width, height = int(figure_size[0] * dpi) // column_number, int(figure_size[1] * dpi) // row_number
+        height -= title_height
+        assert width > 0 and height > 0
+
+    image = Image.new("RGBA", (width * column_number, (title_height + height) * row_number), "white")
+    painter, cells = ImageDraw.Draw(image), []
+    for location in range(len(frame_sizes)):
+        left, top = (location % column_number) * width, (location // column_number) * (title_height + height)
+        if titles is not None:
+            painter.text((left + width / 2, top + title_height / 2), titles[location],
+                         fill="black", font=font, anchor="mm")
+        cells.append((left, top + title_height, width, height))
+
+    return array(image), cells
+
+
+def paste_frame(panel, cell, frame):
+    """
+    Paste a frame into the center of a cell, where the frame is scaled to fit the cell.
+
+    :param panel: RGBA pixels of the panel.
+    :type panel: numpy.ndarray
+
+    :param cell: location (left, top, width, height) of the cell.
+    :type cell: tuple
+
+    :param frame: RGBA pixels of the frame.
+    :type frame: numpy.ndarray
+    """
+    left, top, width, height = cell
+    if frame.shape[:2] != (height, width):
+        scale = min(width / frame.shape[1], height / frame.shape[0])
+        size = (max(1, round(frame.shape[1] * scale)), max(1, round(frame.shape[0] * scale)))
+        frame = asarray(Image.fromarray(frame).resize(size, resample=Image.LANCZOS))
+    left, top = left + (width - frame.shape[1]) // 2, top + (height - frame.shape[0]) // 2
+    panel[top: top + frame.shape[0], left: left + frame.shape[1]] = frame